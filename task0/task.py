@@ -2,33 +2,31 @@ import csv
 from io import StringIO
 
 
-def main(csv_string):
-    reader = csv.reader(StringIO(csv_string))
-    edges = list(reader)
-    if not edges:
-        return []
-
-    vertices = set()
-    for edge in edges:
+def index_edges(csv_string):
+    # Один проход по CSV: каждая вершина переводится в число ровно один раз
+    from_list, to_list = [], []
+    for edge in csv.reader(StringIO(csv_string)):
         if len(edge) >= 2:
-            vertices.add(int(edge[0]))
-            vertices.add(int(edge[1]))
+            from_list.append(int(edge[0]))
+            to_list.append(int(edge[1]))
+
+    sorted_vertices = sorted(set(from_list).union(to_list))
+    vertex_to_index = {vertex: idx for idx, vertex in enumerate(sorted_vertices)}
+
+    # Пары индексов (i, j) для каждого ребра и число вершин
+    pairs = zip(map(vertex_to_index.__getitem__, from_list),
+                map(vertex_to_index.__getitem__, to_list))
+    return pairs, len(sorted_vertices)
 
-    if not vertices:
+
+def main(csv_string):
+    pairs, n = index_edges(csv_string)
+    if not n:
         return []
 
-    sorted_vertices = sorted(vertices)
-    n = len(sorted_vertices)
-    vertex_to_index = {vertex: idx for idx, vertex in enumerate(sorted_vertices)}
     matrix = [[0] * n for _ in range(n)]
-
-    for edge in edges:
-        if len(edge) >= 2:
-            from_vertex = int(edge[0])
-            to_vertex = int(edge[1])
-            i = vertex_to_index[from_vertex]
-            j = vertex_to_index[to_vertex]
-            matrix[i][j] = 1
+    for i, j in pairs:
+        matrix[i][j] = 1
     return matrix
 
 
@@ -42,4 +40,4 @@ if __name__ == "__main__":
     result = main(example_csv)
     print("Матрица смежности:")
     for row in result:
-        print(row)
\ No newline at end of file
+        print(row)
@@ -1,61 +1,80 @@
 import math
-from collections import defaultdict, deque
-from typing import Tuple
+from itertools import accumulate
+from typing import Iterable, List, Tuple
 
 
-def task(s: str, root_id: str) -> Tuple[float, float]:
-
-    edges = []
-    nodes = set()
-
-    for line in s.strip().split('\n'):
-        if line.strip():
-            parts = line.split(',')
-            if len(parts) >= 2:
-                child, parent = parts[0].strip(), parts[1].strip()
-                edges.append((child, parent))
-                nodes.add(child)
-                nodes.add(parent)
+def shannon_entropy(counts: Iterable[int], total: int) -> float:
+    """Энтропия Шеннона распределения, заданного частотами"""
+    if total <= 0:
+        return 0.0
 
-    graph = defaultdict(list)
-    for child, parent in edges:
-        graph[parent].append(child)
+    # -sum(c/N * log2(c/N)) = (S * log2(N) - sum(c * log2(c))) / N, где S = sum(c)
+    counted = 0
+    weighted = 0.0
+    for count in counts:
+        if count > 0:
+            counted += count
+            weighted += count * math.log2(count)
+    return (counted * math.log2(total) - weighted) / total if counted else 0.0
 
-    def analyze_tree(root):
-        level_stats = defaultdict(int)
-        children_stats = defaultdict(int)
 
-        queue = deque([(root, 0)])
+def tree_entropies(indptr: List[int], indices: List[int],
+                   root: int, total: int) -> Tuple[float, float]:
+    """Обход дерева в ширину и энтропии распределений по уровням и по числу детей"""
+    level_stats = []
+    children_stats = [0] * (max(b - a for a, b in zip(indptr, indptr[1:])) + 1)
 
-        while queue:
-            node, level = queue.popleft()
-            level_stats[level] += 1
+    # Обход по уровням: frontier - все узлы текущего уровня, поэтому уровень
+    # узла хранить не нужно, а число узлов уровня - это длина frontier
+    frontier = [root]
 
-            children = graph.get(node, [])
-            children_count = len(children)
-            children_stats[children_count] += 1
+    while frontier:
+        level_stats.append(len(frontier))
+        next_frontier = []
 
-            for child in children:
-                queue.append((child, level + 1))
+        for node in frontier:
+            start, end = indptr[node], indptr[node + 1]
+            children_stats[end - start] += 1
+            if start < end:
+                next_frontier += indices[start:end]
 
-        return level_stats, children_stats
+        frontier = next_frontier
 
-    level_stats, children_stats = analyze_tree(root_id)
+    return shannon_entropy(level_stats, total), shannon_entropy(children_stats, total)
 
-    total_nodes = len(nodes)
-    entropy_level = 0.0
 
-    for level, count in level_stats.items():
-        p = count / total_nodes
-        if p > 0:
-            entropy_level -= p * math.log2(p)
+def task(s: str, root_id: str) -> Tuple[float, float]:
 
-    entropy_children = 0.0
+    # Узлы нумеруются целыми id в порядке появления
+    node_ids = {}
+    children_ids = []
+    parent_ids = []
 
-    for children_count, count in children_stats.items():
-        p = count / total_nodes
-        if p > 0:
-            entropy_children -= p * math.log2(p)
+    for line in s.strip().split('\n'):
+        if line.strip():
+            parts = line.split(',')
+            if len(parts) >= 2:
+                child, parent = parts[0].strip(), parts[1].strip()
+                children_ids.append(node_ids.setdefault(child, len(node_ids)))
+                parent_ids.append(node_ids.setdefault(parent, len(node_ids)))
+
+    total_nodes = len(node_ids)
+    root = node_ids.setdefault(root_id, len(node_ids))
+    n = len(node_ids)
+
+    # Дети хранятся в формате CSR: дети узла v - indices[indptr[v]:indptr[v + 1]]
+    degree = [0] * n
+    for parent in parent_ids:
+        degree[parent] += 1
+    indptr = [0, *accumulate(degree)]
+
+    indices = [0] * len(children_ids)
+    fill = indptr[:-1]
+    for child, parent in zip(children_ids, parent_ids):
+        indices[fill[parent]] = child
+        fill[parent] += 1
+
+    entropy_level, entropy_children = tree_entropies(indptr, indices, root, total_nodes)
 
     entropy = (entropy_level + entropy_children) / 2
 
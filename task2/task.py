@@ -1,6 +1,31 @@
 import json
-from typing import List, Dict, Any, Set
-from collections import defaultdict
+import re
+from typing import List, Optional, Sequence, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 19 и более цифр подряд могут означать целое шире 64 бит, которое orjson
+# превращает в float, а стандартный json - нет
+_LONG_DIGITS = re.compile(r"\d{19}")
+
+
+def _json_loads(json_str: str):
+    """
+    Разбор JSON через orjson, если он установлен. Вход, который orjson
+    отвергает (NaN, Infinity, синтаксические ошибки) или может разобрать
+    иначе (длинные целые), разбирается стандартным json, чтобы результат
+    и тексты ошибок не зависели от наличия orjson. Байтовый вход всегда
+    разбирается стандартным json
+    """
+    if orjson is not None and isinstance(json_str, str) and not _LONG_DIGITS.search(json_str):
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_str)
 
 
 def process_rankings(json_str1: str, json_str2: str, variant: int = 1) -> str:
@@ -9,7 +34,7 @@ def process_rankings(json_str1: str, json_str2: str, variant: int = 1) -> str:
     def parse_ranking(json_str: str) -> List[List[str]]:
 
         try:
-            data = json.loads(json_str)
+            data = _json_loads(json_str)
             if isinstance(data, list):
                 return data
             else:
@@ -19,132 +44,123 @@ def process_rankings(json_str1: str, json_str2: str, variant: int = 1) -> str:
 
     ranking1 = parse_ranking(json_str1)
     ranking2 = parse_ranking(json_str2)
+    elements = collect_elements(ranking1, ranking2)
 
     if variant == 1:
-        return json.dumps(find_contradiction_core(ranking1, ranking2))
+        return json.dumps(find_contradiction_core(ranking1, ranking2, elements))
     else:
-        return json.dumps(find_consistent_ranking(ranking1, ranking2))
+        return json.dumps(find_consistent_ranking(ranking1, ranking2, elements))
+
+
+def collect_elements(ranking1: List[List[str]], ranking2: List[List[str]]) -> Tuple[str, ...]:
+    """
+    Все элементы обеих ранжировок в отсортированном порядке. Метки могут быть
+    разных JSON-типов (строки и числа), поэтому сортируем сначала по имени типа
+    """
+    elements = {element for cluster in ranking1 + ranking2 for element in cluster}
+    return tuple(sorted(elements, key=lambda element: (type(element).__name__, element)))
 
 
-def find_contradiction_core(ranking1: List[List[str]], ranking2: List[List[str]]) -> List[List[str]]:
+def find_contradiction_core(ranking1: List[List[str]], ranking2: List[List[str]],
+                            elements: Optional[Sequence[str]] = None) -> List[List[str]]:
 
-    all_elements = set()
-    for cluster in ranking1 + ranking2:
-        all_elements.update(cluster)
+    elements_list = elements if elements is not None else collect_elements(ranking1, ranking2)
+    n = len(elements_list)
 
-    # Создаем словари позиций для каждой ранжировки
-    pos1 = get_element_positions(ranking1)
-    pos2 = get_element_positions(ranking2)
+    # Ранги элементов в каждой ранжировке
+    ranks1 = get_element_ranks(ranking1, elements_list)
+    ranks2 = get_element_ranks(ranking2, elements_list)
 
     # Находим противоречивые пары
     contradictions = []
 
-    elements_list = list(all_elements)
-    for i in range(len(elements_list)):
-        for j in range(i + 1, len(elements_list)):
-            elem1, elem2 = elements_list[i], elements_list[j]
-
+    for i in range(n):
+        rank1_i, rank2_i = ranks1[i], ranks2[i]
+        for j in range(i + 1, n):
             # Проверяем порядок в обеих ранжировках
-            order1 = compare_positions(pos1[elem1], pos1[elem2])
-            order2 = compare_positions(pos2[elem1], pos2[elem2])
+            rank1_j, rank2_j = ranks1[j], ranks2[j]
+            order1 = (rank1_i < rank1_j) - (rank1_i > rank1_j)
+            order2 = (rank2_i < rank2_j) - (rank2_i > rank2_j)
 
             # Если порядок разный - это противоречие
-            if order1 != order2 and order1 is not None and order2 is not None:
-                contradictions.append([elem1, elem2])
+            if order1 != order2:
+                contradictions.append([elements_list[i], elements_list[j]])
 
     return contradictions
 
 
-def find_consistent_ranking(ranking1: List[List[str]], ranking2: List[List[str]]) -> List[List[str]]:
-
-    all_elements = set()
-    for cluster in ranking1 + ranking2:
-        all_elements.update(cluster)
+def find_consistent_ranking(ranking1: List[List[str]], ranking2: List[List[str]],
+                            elements: Optional[Sequence[str]] = None) -> List[List[str]]:
 
-    dominance_matrix = create_dominance_matrix(ranking1, ranking2, all_elements)
+    elements_list = elements if elements is not None else collect_elements(ranking1, ranking2)
+    dominance_matrix = create_dominance_matrix(ranking1, ranking2, elements_list)
 
-    return build_consistent_ranking(dominance_matrix, all_elements)
+    return build_consistent_ranking(dominance_matrix, elements_list)
 
 
-def get_element_positions(ranking: List[List[str]]) -> Dict[str, tuple]:
+def get_element_ranks(ranking: List[List[str]], elements: Sequence[str]) -> List[int]:
+    """
+    Ранги элементов в ранжировке: level * width + pos_in_cluster, где width -
+    размер наибольшего кластера. Порядок рангов совпадает с порядком пар
+    (уровень, позиция в кластере), поэтому сравнение сводится к одному вычитанию
+    """
+    width = max(map(len, ranking), default=1)
 
-    positions = {}
+    ranks = {}
     for level, cluster in enumerate(ranking):
+        base = level * width
         for pos_in_cluster, element in enumerate(cluster):
-            positions[element] = (level, pos_in_cluster)
-    return positions
-
-
-def compare_positions(pos1: tuple, pos2: tuple) -> int:
-
-    level1, pos_in_cluster1 = pos1
-    level2, pos_in_cluster2 = pos2
-
-    if level1 < level2:
-        return 1
-    elif level1 > level2:
-        return -1
-    else:
-        if pos_in_cluster1 < pos_in_cluster2:
-            return 1
-        elif pos_in_cluster1 > pos_in_cluster2:
-            return -1
-        else:
-            return 0
+            ranks[element] = base + pos_in_cluster
+    return [ranks[element] for element in elements]
 
 
 def create_dominance_matrix(ranking1: List[List[str]], ranking2: List[List[str]],
-                            elements: Set[str]) -> Dict[str, Dict[str, int]]:
-
-    pos1 = get_element_positions(ranking1)
-    pos2 = get_element_positions(ranking2)
-
-    matrix = {elem: {} for elem in elements}
-    elements_list = list(elements)
-
-    for i in range(len(elements_list)):
-        for j in range(i + 1, len(elements_list)):
-            elem1, elem2 = elements_list[i], elements_list[j]
-
-            rel1 = compare_positions(pos1[elem1], pos1[elem2])
-            rel2 = compare_positions(pos2[elem1], pos2[elem2])
-
-            if rel1 == rel2 and rel1 != 0:
-                value = rel1
-            else:
-                value = 0
-
-            matrix[elem1][elem2] = value
-            matrix[elem2][elem1] = -value
+                            elements: Sequence[str]) -> List[List[int]]:
+    """
+    Матрица доминирования: matrix[i][j] = 1, если elements[i] выше elements[j]
+    в обеих ранжировках, -1 - если ниже в обеих, иначе 0
+    """
+    n = len(elements)
+    matrix = [[0] * n for _ in range(n)]
+    ranks1 = get_element_ranks(ranking1, elements)
+    ranks2 = get_element_ranks(ranking2, elements)
+
+    for i in range(n):
+        row_i = matrix[i]
+        rank1_i, rank2_i = ranks1[i], ranks2[i]
+        for j in range(i + 1, n):
+            rank1_j, rank2_j = ranks1[j], ranks2[j]
+
+            rel1 = (rank1_i < rank1_j) - (rank1_i > rank1_j)
+            rel2 = (rank2_i < rank2_j) - (rank2_i > rank2_j)
+            value = rel1 if rel1 == rel2 else 0
+
+            row_i[j] = value
+            matrix[j][i] = -value
 
     return matrix
 
 
-def build_consistent_ranking(matrix: Dict[str, Dict[str, int]],
-                             elements: Set[str]) -> List[List[str]]:
+def build_consistent_ranking(matrix: List[List[int]],
+                             elements: Sequence[str]) -> List[List[str]]:
 
-    element_strength = {}
-    for elem in elements:
-        strength = 0
-        for other_elem in elements:
-            if elem != other_elem and matrix[elem].get(other_elem, 0) == 1:
-                strength += 1
-        element_strength[elem] = strength
+    # Сила элемента - число элементов, которые он доминирует
+    element_strength = [row.count(1) for row in matrix]
 
-    sorted_elements = sorted(elements, key=lambda x: element_strength[x], reverse=True)
+    sorted_ids = sorted(range(len(elements)), key=element_strength.__getitem__, reverse=True)
 
     ranking = []
     current_cluster = []
     current_strength = None
 
-    for elem in sorted_elements:
-        if element_strength[elem] != current_strength:
+    for idx in sorted_ids:
+        if element_strength[idx] != current_strength:
             if current_cluster:
                 ranking.append(current_cluster)
-            current_cluster = [elem]
-            current_strength = element_strength[elem]
+            current_cluster = [elements[idx]]
+            current_strength = element_strength[idx]
         else:
-            current_cluster.append(elem)
+            current_cluster.append(elements[idx])
 
     if current_cluster:
         ranking.append(current_cluster)
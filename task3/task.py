@@ -1,6 +1,31 @@
 import json
-from typing import List, Dict, Set, Tuple
-from collections import defaultdict, deque
+import re
+from typing import List, Dict, Iterator, Set, Tuple
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 19 и более цифр подряд могут означать целое шире 64 бит, которое orjson
+# превращает в float, а стандартный json - нет
+_LONG_DIGITS = re.compile(r"\d{19}")
+
+
+def _json_loads(json_str: str):
+    """
+    Разбор JSON через orjson, если он установлен. Вход, который orjson
+    отвергает (NaN, Infinity, синтаксические ошибки) или может разобрать
+    иначе (длинные целые), разбирается стандартным json, чтобы результат
+    и тексты ошибок не зависели от наличия orjson. Байтовый вход всегда
+    разбирается стандартным json
+    """
+    if orjson is not None and isinstance(json_str, str) and not _LONG_DIGITS.search(json_str):
+        try:
+            return orjson.loads(json_str)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(json_str)
 
 
 class ClusterRanking:
@@ -30,6 +55,11 @@ class ClusterRanking:
         """Получение номера кластера для элемента"""
         return self.cluster_map.get(element, -1)
 
+    def get_clusters(self, elements: List[str]) -> List[int]:
+        """Номера кластеров для списка элементов (-1 для отсутствующих)"""
+        cluster_map = self.cluster_map
+        return [cluster_map.get(element, -1) for element in elements]
+
     def get_relation(self, a: str, b: str) -> str:
 
         if a not in self.cluster_map or b not in self.cluster_map:
@@ -55,51 +85,94 @@ def find_contradictions(ranking1: ClusterRanking, ranking2: ClusterRanking) -> L
     """
     contradictions = []
     elements = sorted(ranking1.elements.union(ranking2.elements))
+    clusters1 = ranking1.get_clusters(elements)
+    clusters2 = ranking2.get_clusters(elements)
 
     for i in range(len(elements)):
-        for j in range(i + 1, len(elements)):
-            a, b = elements[i], elements[j]
+        c1_i, c2_i = clusters1[i], clusters2[i]
+        # Пропускаем если элемент отсутствует в какой-либо ранжировке
+        if c1_i < 0 or c2_i < 0:
+            continue
 
-            rel1 = ranking1.get_relation(a, b)
-            rel2 = ranking2.get_relation(a, b)
-
-            # Пропускаем если один из элементов отсутствует в какой-либо ранжировке
-            if rel1 == "?" or rel2 == "?":
+        for j in range(i + 1, len(elements)):
+            c1_j, c2_j = clusters1[j], clusters2[j]
+            if c1_j < 0 or c2_j < 0:
                 continue
 
-            # Проверяем противоречия
-            if (rel1 == "<" and rel2 == ">") or (rel1 == ">" and rel2 == "<"):
-                contradictions.append((a, b))
+            # Противоречие: в ранжировках элементы упорядочены строго в разные стороны
+            if (c1_i - c1_j) * (c2_i - c2_j) < 0:
+                contradictions.append((elements[i], elements[j]))
 
     return contradictions
 
 
-def find_transitive_closure(relations: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], str]:
+def iter_bits(row: int) -> Iterator[int]:
+    """Номера установленных битов битовой строки по возрастанию"""
+    while row:
+        low = row & -row
+        yield low.bit_length() - 1
+        row ^= low
 
-    elements = set()
-    for (a, b) in relations.keys():
-        elements.add(a)
-        elements.add(b)
 
-    elements = list(elements)
-    closure = relations.copy()
+def transitive_closure_bits(rows: List[int]) -> List[int]:
+    """
+    Транзитивное замыкание отношения, заданного битовыми строками:
+    бит j в rows[i] означает, что i связан с j
+    """
+    rows = list(rows)
+
+    # Алгоритм Уоршелла: строка k целиком добавляется ко всем строкам, где есть бит k
+    for k in range(len(rows)):
+        bit = 1 << k
+        row_k = rows[k]
+        for i in range(len(rows)):
+            if rows[i] & bit:
+                rows[i] |= row_k
+
+    return rows
+
 
-    # Используем алгоритм Флойда-Уоршелла для нахождения транзитивного замыкания
-    for k in elements:
-        for i in elements:
-            for j in elements:
-                if i == j:
-                    continue
+def transpose_bits(rows: List[int]) -> List[int]:
+    """Транспонирование отношения, заданного битовыми строками"""
+    transposed = [0] * len(rows)
+    for i, row in enumerate(rows):
+        bit = 1 << i
+        for j in iter_bits(row):
+            transposed[j] |= bit
+    return transposed
 
-                # Если i < k и k < j, то i < j
-                if (i, k) in closure and closure[(i, k)] == "<" and \
-                        (k, j) in closure and closure[(k, j)] == "<":
-                    closure[(i, j)] = "<"
 
-                # Если i > k и k > j, то i > j
-                elif (i, k) in closure and closure[(i, k)] == ">" and \
-                        (k, j) in closure and closure[(k, j)] == ">":
-                    closure[(i, j)] = ">"
+def find_transitive_closure(relations: Dict[Tuple[str, str], str]) -> Dict[Tuple[str, str], str]:
+    """
+    Транзитивное замыкание отношений "<" и ">".
+
+    Если пара выводится и цепочкой "<", и цепочкой ">" (противоречивые или
+    циклические отношения), в результат записывается "<"
+    """
+    elements = list(dict.fromkeys(element for pair in relations for element in pair))
+    index = {element: i for i, element in enumerate(elements)}
+
+    less = [0] * len(elements)
+    greater = [0] * len(elements)
+    for (a, b), rel in relations.items():
+        if rel == "<":
+            less[index[a]] |= 1 << index[b]
+        elif rel == ">":
+            greater[index[a]] |= 1 << index[b]
+
+    # Если i < k и k < j, то i < j; если i > k и k > j, то i > j
+    # Обычно ">" - транспонированное "<", тогда второй раз замыкание не строим
+    mirrored = greater == transpose_bits(less)
+    less = transitive_closure_bits(less)
+    greater = transpose_bits(less) if mirrored else transitive_closure_bits(greater)
+
+    closure = relations.copy()
+    for i, a in enumerate(elements):
+        self_bit = 1 << i
+        # Пары, выводимые обоими отношениями, остаются за "<"
+        for rel, row in (("<", less[i] & ~self_bit), (">", greater[i] & ~(less[i] | self_bit))):
+            for j in iter_bits(row):
+                closure[(a, elements[j])] = rel
 
     return closure
 
@@ -109,12 +182,6 @@ def build_consistent_ranking(ranking1: ClusterRanking, ranking2: ClusterRanking)
     # Собираем все элементы
     all_elements = sorted(ranking1.elements.union(ranking2.elements))
 
-    graph = defaultdict(set)
-    indegree = defaultdict(int)
-
-    for element in all_elements:
-        indegree[element] = 0
-
     # Собираем отношения из обеих ранжировок
     relations = {}
 
@@ -131,81 +198,68 @@ def build_consistent_ranking(ranking1: ClusterRanking, ranking2: ClusterRanking)
 
             if rel1 == rel2 and rel1 in ["<", ">"]:
                 relations[(a, b)] = rel1
-                if rel1 == "<":
-                    graph[a].add(b)
-                else:
-                    graph[b].add(a)
             elif (rel1 == "=" and rel2 in ["<", ">"]) or (rel2 == "=" and rel1 in ["<", ">"]):
-                rel = rel1 if rel1 != "=" else rel2
-                relations[(a, b)] = rel
-                if rel == "<":
-                    graph[a].add(b)
-                else:
-                    graph[b].add(a)
-
+                relations[(a, b)] = rel1 if rel1 != "=" else rel2
             elif (rel1 == "<" and rel2 == ">") or (rel1 == ">" and rel2 == "<"):
                 relations[(a, b)] = rel1
-                if rel1 == "<":
-                    graph[a].add(b)
-                else:
-                    graph[b].add(a)
 
     relations = find_transitive_closure(relations)
 
-    graph = defaultdict(set)
+    # Граф "a < b" по номерам элементов: бит v в successors[u] - ребро u -> v
+    index = {element: i for i, element in enumerate(all_elements)}
+    n = len(all_elements)
+    successors = [0] * n
     for (a, b), rel in relations.items():
         if rel == "<":
-            graph[a].add(b)
-
-    indegree = defaultdict(int)
-    for element in all_elements:
-        indegree[element] = 0
+            successors[index[a]] |= 1 << index[b]
 
-    for u in graph:
-        for v in graph[u]:
+    indegree = [0] * n
+    for row in successors:
+        for v in iter_bits(row):
             indegree[v] += 1
 
+    # Номера кластеров элементов в исходных ранжировках (-1 - элемент отсутствует)
+    clusters1 = ranking1.get_clusters(all_elements)
+    clusters2 = ranking2.get_clusters(all_elements)
+
     #сортировка
     result_clusters = []
-    visited = set()
+    visited = [False] * n
+    visited_count = 0
 
-    while len(visited) < len(all_elements):
-        zero_indegree = [elem for elem in all_elements
-                         if indegree[elem] == 0 and elem not in visited]
+    while visited_count < n:
+        zero_indegree = [u for u in range(n) if indegree[u] == 0 and not visited[u]]
 
         if not zero_indegree:
-
-            for elem in all_elements:
-                if elem not in visited:
-                    zero_indegree = [elem]
-                    break
+            zero_indegree = [visited.index(False)]
 
         current_cluster = []
 
-        for elem in zero_indegree:
-            if elem not in visited:
-                current_cluster.append(elem)
-                visited.add(elem)
+        for u in zero_indegree:
+            current_cluster.append(u)
+            visited[u] = True
+            visited_count += 1
 
-                # Уменьшаем степень соседей
-                for neighbor in graph[elem]:
-                    indegree[neighbor] -= 1
+            # Уменьшаем степень соседей
+            for v in iter_bits(successors[u]):
+                indegree[v] -= 1
 
         # Группируем элементы в одном кластере, если они были в одном кластере в исходных ранжировках
         clustered_current = []
         temp_cluster = []
+        last = -1
 
-        for elem in current_cluster:
+        for u in current_cluster:
             if temp_cluster:
-                last_elem = temp_cluster[-1]
-                if (ranking1.get_relation(last_elem, elem) == "=" and
-                        ranking2.get_relation(last_elem, elem) == "="):
-                    temp_cluster.append(elem)
+                if (clusters1[last] == clusters1[u] != -1 and
+                        clusters2[last] == clusters2[u] != -1):
+                    temp_cluster.append(all_elements[u])
                 else:
                     clustered_current.append(temp_cluster.copy())
-                    temp_cluster = [elem]
+                    temp_cluster = [all_elements[u]]
             else:
-                temp_cluster = [elem]
+                temp_cluster = [all_elements[u]]
+            last = u
 
         if temp_cluster:
             clustered_current.append(temp_cluster)
@@ -229,8 +283,8 @@ def main(json_str1: str, json_str2: str) -> str:
     """
     try:
         # Парсим входные данные
-        data1 = json.loads(json_str1)
-        data2 = json.loads(json_str2)
+        data1 = _json_loads(json_str1)
+        data2 = _json_loads(json_str2)
 
         # Создаем объекты ранжировок
         ranking1 = ClusterRanking(data1)
@@ -1,6 +1,7 @@
 import json
 import math
-from typing import Dict, List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional
+from collections import defaultdict
 from enum import Enum
 
 
@@ -54,22 +55,30 @@ class MembershipFunction:
         return math.exp(-((x - mean) ** 2) / (2 * sigma ** 2))
 
     @staticmethod
-    def evaluate(x: float, func_type: str, params: List[float]) -> float:
+    def resolve(func_type: str) -> Callable[[float, List[float]], float]:
         """
-        Вычисление значения функции принадлежности
+        Выбор функции принадлежности по названию типа
 
         """
         func_type = func_type.lower()
 
         if func_type == FuzzySetType.TRIANGULAR.value:
-            return MembershipFunction.triangular(x, params)
+            return MembershipFunction.triangular
         elif func_type == FuzzySetType.TRAPEZOIDAL.value:
-            return MembershipFunction.trapezoidal(x, params)
+            return MembershipFunction.trapezoidal
         elif func_type == FuzzySetType.GAUSSIAN.value:
-            return MembershipFunction.gaussian(x, params)
+            return MembershipFunction.gaussian
         else:
             raise ValueError(f"Неизвестный тип функции: {func_type}")
 
+    @staticmethod
+    def evaluate(x: float, func_type: str, params: List[float]) -> float:
+        """
+        Вычисление значения функции принадлежности
+
+        """
+        return MembershipFunction.resolve(func_type)(x, params)
+
 
 class LinguisticVariable:
     """Класс для работы с лингвистической переменной"""
@@ -82,17 +91,30 @@ class LinguisticVariable:
         self.name = name
         self.terms = terms
         self.term_values = {}  # Для хранения текущих значений принадлежности
+        self._compiled_terms = self._compile_terms()
+
+    def _compile_terms(self) -> List[Tuple[str, Callable[[float, List[float]], float], List[float]]]:
+        """Выбор функции принадлежности для каждого терма один раз при создании"""
+        compiled = []
+        for term, config in self.terms.items():
+            try:
+                func = MembershipFunction.resolve(config.get("type", "triangular"))
+                params = config.get("params", [])
+            except Exception:
+                # Некорректный терм (не словарь, неизвестный или нестроковый тип):
+                # он разбирается заново при фаззификации, и ошибка возникает там же, где и раньше
+                func = lambda x, _, config=config: MembershipFunction.evaluate(
+                    x, config.get("type", "triangular"), config.get("params", []))
+                params = None
+            compiled.append((term, func, params))
+        return compiled
 
     def fuzzify(self, x: float) -> Dict[str, float]:
         """
         Фаззификация - вычисление степеней принадлежности для всех термов
 
         """
-        result = {}
-        for term, config in self.terms.items():
-            func_type = config.get("type", "triangular")
-            params = config.get("params", [])
-            result[term] = MembershipFunction.evaluate(x, func_type, params)
+        result = {term: func(x, params) for term, func, params in self._compiled_terms}
 
         self.term_values = result
         return result
@@ -120,6 +142,12 @@ class FuzzyRule:
         self.condition = rule_data.get("if", {})
         self.conclusion = rule_data.get("then", {})
 
+        # Условие и заключение не меняются - кэшируем их в удобном для вычисления виде
+        self._condition_items = tuple(self.condition.items())
+        self._conclusion_variable = list(self.conclusion.keys())[0] if self.conclusion else ""
+        self._conclusion_term = (self.conclusion.get(self._conclusion_variable, "")
+                                 if self._conclusion_variable else "")
+
     def evaluate(self, input_values: Dict[str, Dict[str, float]]) -> float:
         """
         Вычисление степени активации правила
@@ -127,23 +155,25 @@ class FuzzyRule:
         """
         activation = 1.0
 
-        for variable, term in self.condition.items():
-            if variable in input_values and term in input_values[variable]:
-                # Используем минимальную активацию (логическое И)
-                activation = min(activation, input_values[variable][term])
-            else:
+        for variable, term in self._condition_items:
+            memberships = input_values.get(variable)
+            if memberships is None or term not in memberships:
                 return 0.0
 
+            # Используем минимальную активацию (логическое И)
+            value = memberships[term]
+            if value < activation:
+                activation = value
+
         return activation
 
     def get_conclusion_variable(self) -> str:
         """Получение имени выходной переменной"""
-        return list(self.conclusion.keys())[0] if self.conclusion else ""
+        return self._conclusion_variable
 
     def get_conclusion_term(self) -> str:
         """Получение имени выходного терма"""
-        variable = self.get_conclusion_variable()
-        return self.conclusion.get(variable, "") if variable else ""
+        return self._conclusion_term
 
 
 class FuzzyInference:
@@ -152,25 +182,27 @@ class FuzzyInference:
     def __init__(self, rules: List[FuzzyRule]):
         self.rules = rules
 
+        # Правила группируются по выходному терму, чтобы агрегировать их за один проход
+        self._rules_by_term = defaultdict(list)
+        for rule in rules:
+            self._rules_by_term[rule.get_conclusion_term()].append(rule)
+
     def infer(self, input_values: Dict[str, float],
               output_var: LinguisticVariable) -> Dict[str, float]:
-        rule_activations = {}
-        for i, rule in enumerate(self.rules):
-            activation = rule.evaluate(input_values)
-            if activation > 0:
-                rule_activations[i] = {
-                    'activation': activation,
-                    'conclusion_var': rule.get_conclusion_variable(),
-                    'conclusion_term': rule.get_conclusion_term()
-                }
+        rules_by_term = self._rules_by_term
 
         # метод MAX
         aggregated_output = {}
         for term in output_var.terms.keys():
+            bucket = rules_by_term.get(term)
+            if not bucket:
+                continue
+
             max_activation = 0.0
-            for rule_data in rule_activations.values():
-                if rule_data['conclusion_term'] == term:
-                    max_activation = max(max_activation, rule_data['activation'])
+            for rule in bucket:
+                activation = rule.evaluate(input_values)
+                if activation > max_activation:
+                    max_activation = activation
             if max_activation > 0:
                 aggregated_output[term] = max_activation
 
@@ -188,6 +220,47 @@ class FuzzyController:
         self.rules = rules
         self.inference = FuzzyInference(rules)
 
+        # Центры и ширины выходных термов не меняются: считаются при первой активации терма
+        # и запоминаются, поэтому неиспользуемые термы не разбираются вовсе
+        self._term_center = {}
+        self._term_width = {}
+
+    def _center(self, term: str) -> float:
+        """Центр выходного терма (с запоминанием)"""
+        if term not in self._term_center:
+            config = self.heating_var.terms[term]
+            func_type = config.get("type", "triangular")
+            params = config.get("params", [])
+
+            if func_type == FuzzySetType.TRIANGULAR.value and len(params) == 3:
+                center = params[1]
+            elif func_type == FuzzySetType.TRAPEZOIDAL.value and len(params) == 4:
+                center = (params[1] + params[2]) / 2
+            elif func_type == FuzzySetType.GAUSSIAN.value and len(params) == 2:
+                center = params[0]
+            else:
+                center = sum(params) / len(params) if params else 0
+
+            self._term_center[term] = center
+        return self._term_center[term]
+
+    def _width(self, term: str) -> float:
+        """Ширина выходного терма (с запоминанием)"""
+        if term not in self._term_width:
+            config = self.heating_var.terms[term]
+            func_type = config.get("type", "triangular")
+            params = config.get("params", [])
+
+            if func_type == FuzzySetType.TRIANGULAR.value and len(params) == 3:
+                width = params[2] - params[0]
+            elif func_type == FuzzySetType.TRAPEZOIDAL.value and len(params) == 4:
+                width = params[3] - params[0]
+            else:
+                width = 1.0  # По умолчанию
+
+            self._term_width[term] = width
+        return self._term_width[term]
+
     def control(self, temperature: float) -> float:
 
         temp_memberships = self.temperature_var.fuzzify(temperature)
@@ -214,27 +287,8 @@ class FuzzyController:
             if activation <= 0:
                 continue
 
-            config = self.heating_var.terms[term]
-            func_type = config.get("type", "triangular")
-            params = config.get("params", [])
-
-            if func_type == FuzzySetType.TRIANGULAR.value and len(params) == 3:
-                center = params[1]
-            elif func_type == FuzzySetType.TRAPEZOIDAL.value and len(params) == 4:
-                center = (params[1] + params[2]) / 2
-            elif func_type == FuzzySetType.GAUSSIAN.value and len(params) == 2:
-                center = params[0]
-            else:
-                center = sum(params) / len(params) if params else 0
-
-            if func_type == FuzzySetType.TRIANGULAR.value and len(params) == 3:
-                width = params[2] - params[0]
-            elif func_type == FuzzySetType.TRAPEZOIDAL.value and len(params) == 4:
-                width = params[3] - params[0]
-            else:
-                width = 1.0  # По умолчанию
-
-            area = activation * width
+            center = self._center(term)
+            area = activation * self._width(term)
 
             numerator += center * area
             denominator += area
@@ -260,22 +314,7 @@ class FuzzyController:
         max_terms = [term for term, activation in fuzzy_set.items()
                      if abs(activation - max_activation) < 1e-6]
 
-        centers = []
-        for term in max_terms:
-            config = self.heating_var.terms[term]
-            params = config.get("params", [])
-            func_type = config.get("type", "triangular")
-
-            if func_type == FuzzySetType.TRIANGULAR.value and len(params) == 3:
-                center = params[1]
-            elif func_type == FuzzySetType.TRAPEZOIDAL.value and len(params) == 4:
-                center = (params[1] + params[2]) / 2
-            elif func_type == FuzzySetType.GAUSSIAN.value and len(params) == 2:
-                center = params[0]
-            else:
-                center = sum(params) / len(params) if params else 0
-
-            centers.append(center)
+        centers = [self._center(term) for term in max_terms]
 
         return sum(centers) / len(centers) if centers else 0.0
 